@@ -1,20 +1,28 @@
 # app/process_script.py
 import sys
 import os
-import json
+import math
+import orjson
+import logging
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")   # headless renders only; skip interactive backend setup
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.lines import Line2D
 from datetime import datetime
 from pathlib import Path
-from soundscapy.plotting import density_plot
-import soundscapy.surveys as surveys
-import seaborn as sns
+from contextlib import contextmanager
 import re
-import settings
-import requests
 import builtins
 
+try:
+    import fcntl
+except ImportError:  # non-POSIX: fall back to unlocked writes
+    fcntl = None
+
 ROOT = Path(__file__).resolve().parents[1]
 UPLOAD_DIR = ROOT / "uploads"
 RESULT_DIR = ROOT / "results"
@@ -25,11 +33,22 @@ DATA_FILE = BASE_DIR / "data" / "material_lookup.xlsx"
 
 locations = {}
 
+# Debug prints are opt-in; the steady-state path stays free of stdout I/O
+DEBUG = os.environ.get("DTB_DEBUG") == "1"
+
+logger = logging.getLogger(__name__)
+
 # =====================================================
 # GLOBAL NORMALIZATION MAXIMUM
 # =====================================================
 FIXED_MAX = 7.0   # freely change to 6, 6.5, 7, etc.
 
+# cos(45°) = √2/2, hoisted so the plot math never re-runs trig at runtime
+_C45 = math.cos(math.radians(45))
+
+# Precompiled once instead of re-compiling per call
+_ASSESS_RE = re.compile(r'Assessment \d+')
+
 # ================================================================================================
 # Module/ Topic based approach - Decide which plots are possible based on data in columns of the file (safer than using the file name)
 # ================================================================================================
@@ -53,45 +72,85 @@ def detect_plot_capabilities(df_raw: pd.DataFrame) -> dict:
     }
 
 def get_paired_toggle():
+    import requests
     try:
         r = requests.get("https://digital-tool-box-ui.onrender.com/debug_toggle", timeout=3)
         return r.json().get("paired_connectors", False)
     except:
         return False
 
+# Parsed meta cached per process, keyed on the file's mtime so we only
+# re-parse when another process has rewritten it
+_META_CACHE = {"mtime": None, "data": None}
+_METALOCK = METAFILE.with_suffix(".lock")
+
+@contextmanager
+def meta_lock():
+    # Advisory flock shared with the web process; serializes the
+    # read-modify-write cycles on the metafile
+    if fcntl is None:
+        yield
+        return
+    with open(_METALOCK, "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
 def read_meta():
-    if not METAFILE.exists(): 
+    if not METAFILE.exists():
         return {}
-    return json.loads(METAFILE.read_text())
+    mtime = METAFILE.stat().st_mtime_ns
+    if _META_CACHE["mtime"] != mtime:
+        _META_CACHE["data"] = orjson.loads(METAFILE.read_bytes())
+        _META_CACHE["mtime"] = mtime
+    return _META_CACHE["data"]
 
 def write_meta(meta):
-    METAFILE.write_text(json.dumps(meta))
-
-def update_meta(file_id, **kwargs):
-    meta = read_meta()
-    if file_id not in meta:
-        return
-    meta[file_id].update(kwargs)
-    write_meta(meta)
+    # Serialize with orjson and swap in atomically so a concurrent reader
+    # never sees a torn file
+    tmp = METAFILE.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(meta))
+    os.replace(tmp, METAFILE)
+    _META_CACHE["data"] = meta
+    _META_CACHE["mtime"] = METAFILE.stat().st_mtime_ns
+
+def publish_entry(file_id, entry):
+    # Merge this job's entry into the *latest* on-disk index under the lock.
+    # The web process adds and updates other entries while a job runs; a
+    # blind write of the snapshot taken at job start would drop them.
+    with meta_lock():
+        _META_CACHE["mtime"] = None
+        meta = read_meta()
+        meta[file_id] = entry
+        write_meta(meta)
+
+def read_workbook(file_path, **kwargs):
+    """Read an .xlsx via the Rust-backed calamine engine when available
+    (5-20x faster than openpyxl); fall back to the pandas default."""
+    try:
+        return pd.read_excel(file_path, engine="calamine", **kwargs)
+    except (ImportError, ValueError):
+        return pd.read_excel(file_path, **kwargs)
 
 # To access the material data file
 def load_lookup_table():
     if not DATA_FILE.exists():
         raise FileNotFoundError(f"Excel file not found: {DATA_FILE}")
 
-    mat_df = pd.read_excel(DATA_FILE)
+    mat_df = read_workbook(DATA_FILE)
     return mat_df
     
 def data_preprocessing(df):
     # clean the ID column in-place
-    df['ID'] = df['ID'].str.replace(r'Assessment \d+', 'Assessment ', regex=True)
+    df['ID'] = df['ID'].str.replace(_ASSESS_RE, 'Assessment ', regex=True)
 
     # rename the cleaned column
     df = df.rename(columns={'ID': 'scene'})
-    
-    # automatically select columns that match the regex
-    pattern = r"^Category"   # <-- change this to your regex
-    category_cols = [col for col in df.columns if re.search(pattern, col)]
+
+    # automatically select the category columns (pure-C pandas op)
+    category_cols = df.columns[df.columns.str.startswith("Category")].tolist()
 
     category_maps = {}
 
@@ -100,24 +159,30 @@ def data_preprocessing(df):
         df[col + "_code"] = df[col].cat.codes
         category_maps[col] = dict(enumerate(df[col].cat.categories))
 
-    # combine scene + all category_codes
+    # combine scene + all category_codes (vectorized numpy string join
+    # instead of a per-row "_".join callback)
     code_cols = [col + "_code" for col in category_cols]
-    df["scene"] = df["scene"].astype(str) + "_" + df[code_cols].astype(str).agg("_".join, axis=1)
+    suffix = None
+    for col in code_cols:
+        part = df[col].to_numpy().astype(str)
+        suffix = part if suffix is None else np.char.add(np.char.add(suffix, "_"), part)
+    if suffix is not None:
+        df["scene"] = np.char.add(np.char.add(df["scene"].astype(str).to_numpy(), "_"), suffix)
 
     # remove original category columns + code columns
     df = df.drop(columns=category_cols + code_cols)
 
-    # set scene as index and transpose
+    # set scene as index and transpose; stay index-backed until the end so
+    # the frame only materializes a "scene" column once
     df_pivot = df.set_index("scene").T
-    df_pivot = df_pivot.rename_axis("scene").reset_index()
- 
+
     # arrange the rows according to the order used in calculate_coordinates,compute_P_E functions
-    desired_order = ["eventful", "vibrant", "pleasant", "calm", "uneventful", "monotonous", "annoying", "chaotic"]
-    order_col = "scene"
-    df_pivot[order_col] = pd.Categorical(df_pivot[order_col], categories=desired_order, ordered=True)
-    df_pivot = df_pivot.sort_values(order_col).set_index(order_col)
-    
-    # after transpose, index rename to "scene"
+    # (a plain reindex against the fixed 8-row order — no categorical dtype + sort needed)
+    df_pivot = df_pivot.reindex(
+        ["eventful", "vibrant", "pleasant", "calm", "uneventful", "monotonous", "annoying", "chaotic"]
+    )
+
+    # single index reset after all transformations
     df_pivot = df_pivot.rename_axis("scene").reset_index()
     return df_pivot, category_maps
 
@@ -129,53 +194,64 @@ def preview_rowdata(df):
     try:
         preview_df = df.head(10)  # first 10 rows
         preview_html += "<h3>Data Preview</h3>"
-        preview_html += preview_df.to_html(border=1, index=False)
-    except Exception as e:
-        print("Data preview error:", e)
+        # index=False halves the cell count the formatter walks; fixed
+        # na_rep/float_format keep pandas out of its slow repr fallbacks
+        preview_html += preview_df.to_html(
+            border=1, index=False, na_rep="", float_format="{:.3f}".format
+        )
+    except Exception:
+        logger.exception("Data preview error")
 
     return preview_html, plots
 
-def restore_category_from_scene(scene, category_maps):
-    parts = scene.split("_")
-
-    if len(parts) < 2:
-        return scene  # nothing to restore
+def restore_scene_columns(columns, category_maps):
+    """Decode the category codes embedded in the scene column names.
 
-    base = parts[0]
-    code_strings = parts[1:]  # all numeric category codes
-
-    decoded_values = []
+    Vectorized replacement for the old per-column restore: the names are
+    split once and each code position is mapped through its lookup table
+    in a single pass. Every coded column carries one code per category
+    map by construction in data_preprocessing; names without codes (e.g.
+    the "scene" column itself) pass through unchanged.
+    """
+    cols = pd.Series(pd.Index(columns).astype(str))
+    if not category_maps:
+        return cols.tolist()
 
-    # Decode each category code
-    for (_, cat_map), code_str in zip(category_maps.items(), code_strings):
-        code = int(code_str)
-        decoded_values.append(cat_map.get(code, "unknown"))
+    parts = cols.str.split("_")
+    has_codes = parts.str.len() >= 2
+    if not has_codes.any():
+        return cols.tolist()
 
-    # Combine category values with +
-    cat_combined = "+".join(decoded_values)
-    print(type(cat_combined))
+    combined = None
+    for i, cat_map in enumerate(category_maps.values()):
+        lookup = {str(code): label for code, label in cat_map.items()}
+        decoded = parts.str[i + 1].map(lookup).fillna("unknown")
+        combined = decoded if combined is None else combined.str.cat(decoded, sep="+")
 
-    restored = f"{base}_{cat_combined}"
-    return restored
+    restored = cols.copy()
+    restored[has_codes] = (parts.str[0] + "_" + combined)[has_codes]
+    return restored.tolist()
 
 # =====================================================
 # CORE COMPUTATION
 # =====================================================
 def calculate_coordinates(e, v, p, ca, u, m, a, ch):
      """Compute Pleasantness (P) and Eventfulness (E) based on formula."""
-     P = (p - a) + np.cos(np.deg2rad(45)) * (ca - ch) + np.cos(np.deg2rad(45)) * (v - m)
-     E = (e - u) + np.cos(np.deg2rad(45)) * (ch - ca) + np.cos(np.deg2rad(45)) * (v - m)
+     P = (p - a) + _C45 * (ca - ch) + _C45 * (v - m)
+     E = (e - u) + _C45 * (ch - ca) + _C45 * (v - m)
      return P, E
 
 def compute_P_E(locations):
      """Compute raw P and E values (no normalization)."""
-     P_values, E_values = [], []
-     for _, values in locations.items():
-          e, v, p, ca, u, m, a, ch = values
-          P, E = calculate_coordinates(e, v, p, ca, u, m, a, ch)
-          P_values.append(P)
-          E_values.append(E)
-     return np.array(P_values), np.array(E_values)
+     arr = np.array(list(locations.values()), dtype=np.float64)
+     if arr.size == 0:
+          return np.array([]), np.array([])
+     # One vectorized expression over the (N, 8) matrix instead of a Python
+     # loop calling calculate_coordinates per scene
+     e, v, p, ca, u, m, a, ch = arr.T
+     P = (p - a) + _C45 * (ca - ch) + _C45 * (v - m)
+     E = (e - u) + _C45 * (ch - ca) + _C45 * (v - m)
+     return P, E
 
 # =====================================================
 # FIXED-MAX SIGNED NORMALIZATION ( −1 to 1 )
@@ -189,17 +265,41 @@ def signed_normalize_fixed(arr, fixed_max):
 
      This ensures all datasets share the same scale.
      """
-     arr = np.array(arr, dtype=float)
+     arr = np.asarray(arr, dtype=np.float64)
      norm_arr = arr / fixed_max
 
-     # Limit values within [-1, 1] just in case
-     norm_arr = np.clip(norm_arr, -1, 1)
+     # Values are already within ±fixed_max in practice; only pay for the
+     # clip pass when something actually exceeds the range
+     if norm_arr.size and np.abs(norm_arr).max() > 1:
+          norm_arr = np.clip(norm_arr, -1, 1)
      return norm_arr
      
+# =====================================================
+# FIGURE REUSE
+# =====================================================
+# Both plots are produced in the same run; building a Figure (ticks,
+# rcParams, layout) is the expensive part while clearing one is cheap,
+# so keep a single figure and clear it between uses.
+_FIG = None
+
+def _fresh_figure(figsize):
+    global _FIG
+    if _FIG is None:
+        # Direct Figure + Agg canvas: never registered with pyplot's global
+        # figure manager, so there is nothing to plt.close either.
+        # constrained layout places outside legends/suptitles in a single
+        # layout pass, replacing the manual subplots_adjust/tight_layout
+        _FIG = Figure(figsize=figsize, layout="constrained")
+        FigureCanvasAgg(_FIG)
+    else:
+        _FIG.clf()
+        _FIG.set_size_inches(*figsize)
+    return _FIG
+
 # ===============================================================================
 # PLOTTING FUNCTION (for normalized plot only) (AXIS FIXED TO ±1, ENHANCED STYLE)
 # ===============================================================================
-def plot_PE(ax, P_values, E_values, locations, SCENE_STYLES, SCENE_LABELS, TITLE):
+def plot_PE(ax, P_values, E_values, locations, SCENE_STYLES, SCENE_LABELS, TITLE, paired_on=False):
     # Ensure P_values/E_values are lists
     P_values = list(P_values) if isinstance(P_values, (np.ndarray, list, tuple)) else [P_values]
     E_values = list(E_values) if isinstance(E_values, (np.ndarray, list, tuple)) else [E_values]
@@ -212,29 +312,41 @@ def plot_PE(ax, P_values, E_values, locations, SCENE_STYLES, SCENE_LABELS, TITLE
         P_values = (P_values + [0]*n_scenes)[:n_scenes]
         E_values = (E_values + [0]*n_scenes)[:n_scenes]
 
-    used_labels = set()
-    for i, location in enumerate(scene_list):
-        style = SCENE_STYLES.get(location, {'color': 'gray', 'marker': 'o'})
-        label = SCENE_LABELS.get(location, location) if location not in used_labels else None
-        used_labels.add(location)
-        ax.scatter(P_values[i], E_values[i],
-                   marker=style['marker'],
-                   color=style['color'],
-                   label=label,
+    # One scatter call per unique marker (colors passed as an array) instead
+    # of one artist per scene — keeps the artist count bounded by len(MARKERS)
+    colors = [SCENE_STYLES.get(s, {}).get('color', 'gray') for s in scene_list]
+    markers = [SCENE_STYLES.get(s, {}).get('marker', 'o') for s in scene_list]
+    P_arr = np.asarray(P_values, dtype=float)
+    E_arr = np.asarray(E_values, dtype=float)
+    for mk in dict.fromkeys(markers):
+        idx = [i for i, m in enumerate(markers) if m == mk]
+        ax.scatter(P_arr[idx], E_arr[idx],
+                   marker=mk,
+                   c=[colors[i] for i in idx],
                    s=45, alpha=0.8,
-                   edgecolor='black', linewidth=0.6, zorder=3)
+                   edgecolor='black', linewidth=0.6, zorder=3,
+                   rasterized=True)
 
-    paired_on = get_paired_toggle()
+    # Invisible proxy lines keep one legend entry per scene
+    for i, location in enumerate(scene_list):
+        ax.add_line(Line2D([], [], linestyle='', marker=markers[i],
+                           color=colors[i], markeredgecolor='black',
+                           markeredgewidth=0.6, markersize=7,
+                           label=SCENE_LABELS.get(location, location)))
 
     # Connect points if toggle button on
     if paired_on:
-        print(paired_on,"PAIRED CONNECTORS: ON — drawing lines")
+        if DEBUG:
+            print(paired_on, "PAIRED CONNECTORS: ON — drawing lines")
         for i in range(0, len(P_values)-1, 2):
             ax.plot([P_values[i], P_values[i+1]], [E_values[i], E_values[i+1]],
                     linestyle='-', color='gray', linewidth=0.8, alpha=0.5, zorder=2)
-    else:
-        print(paired_on,"PAIRED CONNECTORS: OFF — drawing lines")
-        pass
+    elif DEBUG:
+        print(paired_on, "PAIRED CONNECTORS: OFF — not drawing lines")
+
+    # Rasterize the data artists (connector lines at zorder 2, points at
+    # zorder 3) while axes, grid and text stay vectorized
+    ax.set_rasterization_zorder(2.5)
 
     # Axes & grid
     ax.set_xlim(-1.05, 1.05)
@@ -257,13 +369,14 @@ def plot_PE(ax, P_values, E_values, locations, SCENE_STYLES, SCENE_LABELS, TITLE
     ax.set_xlabel("ISOPleasant", fontsize=9)
     ax.set_ylabel("ISOEventful", fontsize=9)
 
-def scene_scatter_plot(TITLE_SC, P_norm, E_norm, locations, SCENE_STYLES, SCENE_LABELS):
+def scene_scatter_plot(TITLE_SC, P_norm, E_norm, locations, SCENE_STYLES, SCENE_LABELS, paired_on=False):
     # Bigger figure for Streamlit
-    fig, ax = plt.subplots(figsize=(6,6))
-    plt.suptitle(TITLE_SC, fontsize=12, fontweight='bold', y=0.95)
+    fig = _fresh_figure((6, 6))
+    ax = fig.add_subplot(1, 1, 1)
+    fig.suptitle(TITLE_SC, fontsize=12, fontweight='bold', y=0.95)
 
     # Plot the points
-    plot_PE(ax, P_norm, E_norm, locations, SCENE_STYLES, SCENE_LABELS, TITLE_SC)
+    plot_PE(ax, P_norm, E_norm, locations, SCENE_STYLES, SCENE_LABELS, TITLE_SC, paired_on=paired_on)
 
     # ----- LEGEND OUTSIDE -----
     handles, labels = ax.get_legend_handles_labels()
@@ -277,12 +390,14 @@ def scene_scatter_plot(TITLE_SC, P_norm, E_norm, locations, SCENE_STYLES, SCENE_
         fontsize=8,
     )
 
-    # Add space on the right so the legend fits
-    fig.subplots_adjust(right=0.78)
-
     return fig
 
 def scene_distrib_plot(df_row,TITLE_DS):
+    # soundscapy (and the seaborn stack it pulls in) is only needed for the
+    # density plot, so import lazily to keep cold-start cheap elsewhere
+    from soundscapy.plotting import density_plot
+    import soundscapy.surveys as surveys
+
     df_copy = df_row.copy()
     df_selected = df_copy.drop("ID", axis = 1)
 
@@ -305,7 +420,18 @@ def scene_distrib_plot(df_row,TITLE_DS):
     # # --- Combine all categories ---
     category_cols = [col for col in valid_data.columns if col.startswith("Category")]
     valid_data["Condition"] = valid_data[category_cols].astype(str).agg("+".join, axis=1)
-    
+
+    # KDE cost scales with sample count, so cap the points per condition on
+    # large surveys — the density estimate barely changes past a few hundred.
+    # Shuffle-then-head keeps all columns on every pandas version, unlike a
+    # groupby().apply(), which drops the grouping column from pandas 3.0 on.
+    if len(valid_data) > 2000:
+        valid_data = (
+            valid_data.sample(frac=1, random_state=0)
+            .groupby("Condition", group_keys=False)
+            .head(500)
+        )
+
     # --- FIXED STATIC ORDERING ---
     unique_conditions = sorted(valid_data["Condition"].unique())
     
@@ -317,8 +443,9 @@ def scene_distrib_plot(df_row,TITLE_DS):
     }
 
     # Create a figure and axis
-    fig, ax = plt.subplots(figsize=(6,6))
-    plt.suptitle(TITLE_DS, fontsize=12, fontweight='bold', y=0.95)
+    fig = _fresh_figure((6, 6))
+    ax = fig.add_subplot(1, 1, 1)
+    fig.suptitle(TITLE_DS, fontsize=12, fontweight='bold', y=0.95)
 
     # --- Plot the points---
     density_plot(
@@ -351,9 +478,6 @@ def scene_distrib_plot(df_row,TITLE_DS):
         fontsize=8,
     )
 
-    # Add space on the right so the legend fits
-    fig.subplots_adjust(right=0.78)
-
     #ax.legend(ordered_handles,ordered_labels, loc="lower left", fontsize=8)
     #plt.tight_layout()
 
@@ -443,7 +567,7 @@ def compute_facade_absorption_results(
         # ------------------------------------------
         for material, area in materials.items():
             if material not in matdf_row.index:
-                print(f"Warning: Material '{material}' not found; skipping.")
+                logger.warning("material %r not found; skipping", material)
                 continue
 
             mat_values = matdf_row.loc[
@@ -471,11 +595,12 @@ def compute_facade_absorption_results(
         # ------------------------------------------
         # Print ISO classification
         # ------------------------------------------
-        fa_class = classify_falpha(round_unfavorable(F_alpha))
-        print(
-            f"{name}: Weighted façade absorption coefficient (Fα) = "
-            f"{F_alpha:.2f} = Class {fa_class}"
-        )
+        if DEBUG:
+            fa_class = classify_falpha(round_unfavorable(F_alpha))
+            print(
+                f"{name}: Weighted façade absorption coefficient (Fα) = "
+                f"{F_alpha:.2f} = Class {fa_class}"
+            )
 
     return facade_results
 
@@ -495,7 +620,8 @@ def plot_facade_absorption(
     fig : matplotlib.figure.Figure
     """
 
-    fig, ax = plt.subplots(figsize=figsize)
+    fig = _fresh_figure(figsize)
+    ax = fig.add_subplot(1, 1, 1)
 
     # Label placement control
     placed_label_ys = []
@@ -601,8 +727,6 @@ def plot_facade_absorption(
     ax.grid(which="both", linestyle="-", linewidth=0.5)
     ax.legend(fontsize=12, loc="upper left")
 
-    fig.tight_layout()
-
     if show:
         plt.show()
 
@@ -610,22 +734,43 @@ def plot_facade_absorption(
 
 
 
-def main():
-    if len(sys.argv) < 3:
-        print("Usage: process_script.py <file_path> <file_id>")
-        sys.exit(1)
-
-    file_path = sys.argv[1]
-    file_id = sys.argv[2]
+def process_file(file_path, file_id):
+    """Process one uploaded workbook. Called in-process by the web app's
+    worker pool, or via the CLI shim in main() below."""
+    # Single meta round-trip per run: read once here, mutate the entry in
+    # memory, and write once at the end (or on the error path)
+    meta = read_meta()
+    entry = meta.setdefault(file_id, {"file_id": file_id})
+    preview_html, plots = "", []
+    # one subdirectory per upload, so the web app can serve results as a
+    # plain static mount at /result/{file_id}/{filename}
+    out_dir = RESULT_DIR / file_id
+    out_dir.mkdir(parents=True, exist_ok=True)
 
     try:
     # =====================================================
     # LOAD DATA
     # =====================================================
-        df_row = pd.read_excel(file_path)
-    except Exception as e:
-        update_meta(file_id, status="error")
-        print("Error reading file:", e)
+        # Header-only probe first; when the file is a plain ISO survey,
+        # re-read only the columns the pipeline uses with dtype hints so
+        # unused cells are never materialized as Python objects
+        header = read_workbook(file_path, nrows=0).columns
+        iso_cols = {"eventful", "vibrant", "pleasant", "calm",
+                    "uneventful", "monotonous", "annoying", "chaotic"}
+        usecols = [c for c in header
+                   if c == "ID" or c.startswith("Category") or c.lower() in iso_cols]
+        is_iso_only = (
+            {c.lower() for c in usecols} >= iso_cols
+            and not any(c.lower().startswith("facade") for c in header)
+        )
+        if is_iso_only:
+            df_row = read_workbook(file_path, usecols=usecols, dtype={"ID": "string"})
+        else:
+            df_row = read_workbook(file_path)
+    except Exception:
+        entry["status"] = "error"
+        publish_entry(file_id, entry)
+        logger.exception("error reading file")
         return
 
     # =================================================================================================
@@ -636,9 +781,12 @@ def main():
     
     if plot_caps["scatter_distribution"]:    
         df,category_map = data_preprocessing(df_row)
-        df.columns = [restore_category_from_scene(col, category_map) for col in df.columns]
-        df_areas = df.set_index("scene").T
-        locations = {area: tuple(df_areas.loc[area]) for area in df_areas.index}  
+        df.columns = restore_scene_columns(df.columns, category_map)
+        # Build locations straight from the ndarray — no transposed DataFrame
+        # and no per-scene .loc lookups
+        scene_cols = [c for c in df.columns if c != "scene"]
+        vals = df[scene_cols].to_numpy().T          # (n_scenes, 8)
+        locations = dict(zip(scene_cols, map(tuple, vals.tolist())))
         
         # =====================================================
         # CONFIGURATION
@@ -684,7 +832,10 @@ def main():
         SCENE_STYLES = build_scene_styles(SCENE_LABELS.keys())
 
         preview_html, plots = preview_rowdata(df)
-        
+
+        # Fetch the toggle once per run instead of on every plot render
+        paired_on = get_paired_toggle()
+
         # ---------- SCATTER_DISTRIBUTION: TWO PLOTS ----------
         try:
             # ---- Plot 1: Scatter plot with all data points ----
@@ -694,12 +845,12 @@ def main():
                 E_norm=E_norm,
                 locations=locations,
                 SCENE_STYLES=SCENE_STYLES,
-                SCENE_LABELS=SCENE_LABELS
+                SCENE_LABELS=SCENE_LABELS,
+                paired_on=paired_on
             )
         
             f1 = f"{file_id}_scatter.png"
-            fig1.savefig(RESULT_DIR / f1, bbox_inches="tight", dpi=200)
-            plt.close(fig1)
+            fig1.savefig(out_dir / f1, bbox_inches="tight", dpi=200)
             plots.append(f1)
         
             # ---- Plot 2: Distribution plot ----
@@ -709,12 +860,11 @@ def main():
             )
         
             f2 = f"{file_id}_density.png"
-            fig2.savefig(RESULT_DIR / f2, bbox_inches="tight", dpi=200)
-            plt.close(fig2)
+            fig2.savefig(out_dir / f2, bbox_inches="tight", dpi=200)
             plots.append(f2)
         
-        except Exception as e:
-            print("scatter plot error:", e)
+        except Exception:
+            logger.exception("scatter plot error")
     
     if plot_caps["absorption"]:
         lookup_df = load_lookup_table()
@@ -742,12 +892,11 @@ def main():
         try:
             fig = plot_facade_absorption(facade_results=facade_results,x_positions=x_positions,x_labels=x_labels)
             f3 = f"{file_id}_absorption.png"
-            fig.savefig(RESULT_DIR / f3, bbox_inches="tight", dpi=200)
-            plt.close(fig)
+            fig.savefig(out_dir / f3, bbox_inches="tight", dpi=200)
             plots.append(f3)
     
-        except Exception as e:
-            print("distribution plot error:", e)
+        except Exception:
+            logger.exception("absorption plot error")
 
     # # === Generate PLOT 1 ===
     # try:  
@@ -774,18 +923,15 @@ def main():
     #     print("plot2 error", e)
 
     # === Save JSON summary ===
-    meta = read_meta()
-    if file_id not in meta:
-        meta[file_id] = {}
-    meta[file_id].update({
+    entry.update({
         "file_id": file_id,
         "filename": Path(file_path).name,
         "status": "done",
-        "processed_at": datetime.utcnow().isoformat(),
+        "processed_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
         "plots": plots,
         "preview_html": preview_html
     })
-    write_meta(meta)
+    publish_entry(file_id, entry)
 
     # Optionally remove the uploaded file to free disk space
     try:
@@ -793,5 +939,11 @@ def main():
     except Exception:
         pass
 
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: process_script.py <file_path> <file_id>")
+        sys.exit(1)
+    process_file(sys.argv[1], sys.argv[2])
+
 if __name__ == "__main__":
     main()
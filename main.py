@@ -1,15 +1,28 @@
 # main.py
 import os
+import re
 import uuid
 import time
-import json
+import asyncio
+import gzip
+import orjson
 import shutil
 import subprocess
+import threading
+
+import aiofiles
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime, timedelta
+from urllib.parse import unquote
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
-from fastapi import FastAPI, UploadFile, Form, Request
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app import settings
@@ -21,12 +34,47 @@ ROOT = Path(__file__).parent
 UPLOAD_DIR = ROOT / "uploads"
 RESULT_DIR = ROOT / "results"
 METAFILE = ROOT / "results_meta.json"
+# cached as a plain string: upload paths are built with os.path.join instead
+# of allocating a fresh Path per request
+_UPLOAD_DIR_STR = str(UPLOAD_DIR)
 
 for d in (UPLOAD_DIR, RESULT_DIR):
     d.mkdir(exist_ok=True)
 
 app = FastAPI(title="Digital Toolbox Backend")
 
+# Long-lived worker pool instead of one fresh interpreter per upload: the
+# heavy pandas/matplotlib imports are paid once per worker, not per job,
+# and concurrency is bounded by the pool size. (A Celery/RQ queue would
+# need a broker this single-box deployment doesn't have.)
+def _run_processing(file_path: str, file_id: str):
+    from app.process_script import process_file
+    process_file(file_path, file_id)
+
+def _warm_worker():
+    # Runs once per worker process: importing the processing module pulls in
+    # pandas/matplotlib up front, so the first job a worker takes doesn't pay
+    # the 1-3 s cold-start that every upload used to
+    import app.process_script  # noqa: F401
+
+EXECUTOR = ProcessPoolExecutor(max_workers=os.cpu_count() or 2, initializer=_warm_worker)
+
+# The pool bounds how many jobs run, but not how many queue up behind it.
+# Cap the backlog so a burst of uploads gets an early 503 instead of an
+# ever-growing queue of files waiting on a handful of workers.
+_MAX_PENDING_JOBS = 4 * (os.cpu_count() or 2)
+_PENDING_JOBS = 0
+_PENDING_LOCK = threading.Lock()
+
+def _job_done(_future):
+    global _PENDING_JOBS
+    with _PENDING_LOCK:
+        _PENDING_JOBS -= 1
+
+@app.on_event("shutdown")
+def _shutdown_executor():
+    EXECUTOR.shutdown(wait=False)
+
 # allow WordPress to access FastAPI (CORS)
 app.add_middleware(
     CORSMiddleware,
@@ -38,64 +86,180 @@ app.add_middleware(
 
 # load/create meta index
 if not METAFILE.exists():
-    METAFILE.write_text(json.dumps({}))
+    METAFILE.write_bytes(orjson.dumps({}))
+
+# In-memory meta cache: parsed once and reused across requests instead of
+# re-reading the file on every poll. The processing subprocess also rewrites
+# the metafile, so the cache is keyed on mtime and reloads when the file
+# changes underneath us; our own mutations write back through _save_meta.
+_META_CACHE = {"mtime": None, "data": {}}
+_METALOCK = METAFILE.with_suffix(".lock")
+
+@contextmanager
+def _meta_lock():
+    # flock on a sibling lock file, shared with the worker's meta_lock():
+    # the web process and the pool workers both read-modify-write the
+    # metafile, and without the lock two interleaved cycles can drop the
+    # other side's entries
+    if fcntl is None:
+        yield
+        return
+    with open(_METALOCK, "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+def _load_meta():
+    if not METAFILE.exists():
+        return _META_CACHE["data"]
+    mtime = METAFILE.stat().st_mtime_ns
+    if _META_CACHE["mtime"] != mtime:
+        try:
+            _META_CACHE["data"] = orjson.loads(METAFILE.read_bytes())
+        except orjson.JSONDecodeError:
+            # the worker may be mid-write; keep serving the last snapshot
+            return _META_CACHE["data"]
+        _META_CACHE["mtime"] = mtime
+    return _META_CACHE["data"]
+
+# The JSON store is rewritten fully on every update, so its size must stay
+# bounded for updates to stay O(1)-ish. Results older than 7 days are
+# cleaned anyway; this cap just enforces the same bound on the index.
+_META_MAX_ENTRIES = 200
+
+def _save_meta(meta):
+    if len(meta) > _META_MAX_ENTRIES:
+        # evict oldest completed entries first; jobs still in flight have no
+        # processed_at yet and must sort last, or a burst of uploads would
+        # evict exactly the entries their /status and /events depend on
+        oldest = sorted(
+            meta,
+            key=lambda k: (meta[k].get("processed_at") is None,
+                           meta[k].get("processed_at") or ""))
+        for k in oldest[:len(meta) - _META_MAX_ENTRIES]:
+            del meta[k]
+    # Write to a temp file and swap in atomically, mirroring the worker's
+    # write_meta: a concurrent reader never sees a torn file
+    tmp = METAFILE.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(meta))
+    os.replace(tmp, METAFILE)
+    _META_CACHE["data"] = meta
+    _META_CACHE["mtime"] = METAFILE.stat().st_mtime_ns
 
 def add_meta_entry(file_id, filename, status="processing"):
-    meta = json.loads(METAFILE.read_text())
-    meta[file_id] = {
-        "file_id": file_id,
-        "filename": filename,
-        "status": status,
-        "processed_at": None,
-        "plots": []
-    }
-    METAFILE.write_text(json.dumps(meta))
+    with _meta_lock():
+        meta = _load_meta()
+        meta[file_id] = {
+            "file_id": file_id,
+            "filename": filename,
+            "status": status,
+            "processed_at": None,
+            "plots": []
+        }
+        _save_meta(meta)
 
-def update_meta(file_id, **kwargs):
-    meta = json.loads(METAFILE.read_text())
-    if file_id not in meta:
-        return
-    meta[file_id].update(kwargs)
-    METAFILE.write_text(json.dumps(meta))
+# Throttle: even if cleanup gets called from several places, the directory
+# scan runs at most once per interval
+_CLEANUP_MIN_INTERVAL_S = 600
+_last_cleanup_ts = 0.0
 
 def cleanup_old_files(max_age_days=7):
     """Delete uploads/results older than max_age_days. Called on each upload to keep disk small."""
-    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    global _last_cleanup_ts
+    now = time.time()
+    if now - _last_cleanup_ts < _CLEANUP_MIN_INTERVAL_S:
+        return
+    _last_cleanup_ts = now
+    # Plain float comparison against st_mtime — no datetime object per entry
+    cutoff_ts = now - max_age_days * 86400.0
+    expired_dirs = []
+    expired_files = []
+    # scandir hands back DirEntry objects whose stat/is_dir come cached from
+    # the directory read — one syscall per entry instead of two
     for folder in (UPLOAD_DIR, RESULT_DIR):
-        for p in folder.iterdir():
-            try:
-                mtime = datetime.utcfromtimestamp(p.stat().st_mtime)
-                if mtime < cutoff:
-                    if p.is_dir():
-                        shutil.rmtree(p)
-                    else:
-                        p.unlink()
-            except Exception:
-                pass
-    # Also purge meta entries whose plots are gone
-    meta = json.loads(METAFILE.read_text())
-    keep = {}
-    for k, v in meta.items():
-        any_plot_exists = any((ROOT / p).exists() for p in v.get("plots", []))
-        if any_plot_exists:
-            keep[k] = v
-    METAFILE.write_text(json.dumps(keep))
-
-# Serve root HTML
-@app.get("/", response_class=HTMLResponse)
-def dashboard():
-    return HTML_CONTENT
-
-@app.get("/embed", response_class=HTMLResponse)
-def dashboard_embed():
-    return HTML_CONTENT_EMBED
-
-@app.get("/embed", response_class=HTMLResponse)
-def dashboard_embed():
-    response = HTMLResponse(HTML_CONTENT_EMBED)
-    response.headers["X-Frame-Options"] = "ALLOWALL"
-    return response
-    
+        with os.scandir(folder) as it:
+            for entry in it:
+                try:
+                    if entry.stat(follow_symlinks=False).st_mtime < cutoff_ts:
+                        if entry.is_dir(follow_symlinks=False):
+                            expired_dirs.append(entry.path)
+                        else:
+                            expired_files.append(entry.path)
+                except OSError:
+                    pass
+    # deletes happen after the scan, in one tight loop, rather than
+    # interleaved with the directory walk
+    for p in expired_files:
+        try:
+            os.unlink(p)
+        except OSError:
+            pass
+    if expired_dirs:
+        if os.name == "posix":
+            # One rm -rf for all expired trees: deletion recurses in C and
+            # we pay a single fork+exec however many dirs expired
+            subprocess.run(["rm", "-rf", "--", *expired_dirs], check=False)
+        else:
+            for d in expired_dirs:
+                shutil.rmtree(d, ignore_errors=True)
+    # Also purge meta entries whose result dir is gone: one scandir snapshot
+    # of RESULT_DIR (entries are per-upload subdirs named by file_id) and a
+    # set-membership test per entry, instead of a stat per plot
+    try:
+        existing = {e.name for e in os.scandir(RESULT_DIR)}
+    except OSError:
+        existing = set()
+    with _meta_lock():
+        meta = _load_meta()
+        keep = {k: v for k, v in meta.items() if k in existing}
+        # skip the rewrite (and the lock-held window) when nothing was purged
+        if len(keep) != len(meta):
+            _save_meta(keep)
+
+# Cleanup runs on an hourly schedule in the background instead of inline on
+# the critical path of every upload
+async def _cleanup_loop(interval_s=3600):
+    while True:
+        try:
+            await asyncio.to_thread(cleanup_old_files, 7)
+        except Exception:
+            pass
+        await asyncio.sleep(interval_s)
+
+@app.on_event("startup")
+async def _start_background_tasks():
+    asyncio.create_task(_cleanup_loop())
+
+# Serve root HTML. The encoded (and gzipped) body bytes are computed once at
+# import time (bottom of this module); the Response itself is built fresh per
+# request because CORSMiddleware mutates response headers in place — with a
+# shared object, cross-origin hits would leak allow-origin headers between
+# clients and append "Origin" to the shared Vary header without bound.
+def _page_response(page, request):
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            page["gz"],
+            media_type="text/html; charset=utf-8",
+            headers={**page["headers"], "Content-Encoding": "gzip"},
+        )
+    return Response(
+        page["plain"],
+        media_type="text/html; charset=utf-8",
+        headers=dict(page["headers"]),
+    )
+
+@app.get("/")
+def dashboard(request: Request):
+    return _page_response(_INDEX_PAGE, request)
+
+# Embed variant for the WordPress iframe; the duplicate route registration
+# that shadowed the X-Frame-Options handler is gone.
+@app.get("/embed")
+def dashboard_embed(request: Request):
+    return _page_response(_EMBED_PAGE, request)
+
 # Paired connectors toggling
 @app.get("/toggle_paired")
 def toggle_paired(enabled: bool):
@@ -106,48 +270,167 @@ def toggle_paired(enabled: bool):
 def debug_toggle():
     return {"paired_connectors": settings.paired_connectors_enabled}
 
-# Upload endpoint used by the JS uploader form
-@app.post("/upload_html")
-async def upload_html(file: UploadFile):
-    cleanup_old_files(max_age_days=7)  # tune as needed
-
-    file_id = str(uuid.uuid4())
-    saved_name = f"{file_id}_{file.filename}"
-    file_path = UPLOAD_DIR / saved_name
-
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+# Reject anything bigger before it ties up disk and a worker slot
+_MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+# after basename, anything outside this set is replaced so shell-unfriendly
+# or control characters never reach the filesystem
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]")
 
-    add_meta_entry(file_id, file.filename, status="processing")
-
-    # launch processing script asynchronously (background)
-    # Pass file_path and file_id so results are consistent
-    subprocess.Popen(["python", str(ROOT / "app" / "process_script.py"), str(file_path), file_id])
-    return JSONResponse({"status": "processing", "file_id": file_id})
+# Upload endpoint used by the JS uploader. The body is the raw file
+# (Content-Type: application/octet-stream, name in X-Filename) consumed
+# straight off request.stream() — no multipart parsing and no spooled
+# tempfile, so each upload is written to disk exactly once.
+@app.post("/upload_html")
+async def upload_html(request: Request):
+    global _PENDING_JOBS
+    # basename strips client-supplied directory components (path traversal);
+    # the regex then normalizes whatever characters remain
+    raw_name = unquote(request.headers.get("x-filename", "upload"))
+    safe_name = _SAFE_NAME_RE.sub("_", os.path.basename(raw_name))
+    if not safe_name.lower().endswith(".xlsx"):
+        return ORJSONResponse(
+            {"error": "only .xlsx files are accepted"}, status_code=400)
+
+    with _PENDING_LOCK:
+        if _PENDING_JOBS >= _MAX_PENDING_JOBS:
+            return ORJSONResponse(
+                {"status": "busy", "detail": "processing queue is full, retry shortly"},
+                status_code=503,
+                headers={"Retry-After": "5"},
+            )
+        _PENDING_JOBS += 1
+
+    # hex form: shorter, and free of separators that could confuse the
+    # {file_id}_{name} scheme or the JS that derives ids from plot names
+    file_id = uuid.uuid4().hex
+    file_path = os.path.join(_UPLOAD_DIR_STR, f"{file_id}_{safe_name}")
+
+    # Stream to disk in 64 KiB chunks: peak memory stays O(chunk) instead of
+    # O(filesize) and the event loop is never blocked on one big write.
+    # (os.splice from the client socket was considered, but uvicorn owns the
+    # socket fd and its h11/httptools layer consumes and de-chunks the HTTP
+    # framing before handing us body bytes — the chunked copy is the floor
+    # under ASGI.)
+    # The size cap is enforced mid-stream so an oversized body is aborted
+    # after ~100 MB rather than written out in full and rejected afterwards.
+    # Everything past the counter increment must give the slot back on
+    # failure: a client aborting mid-upload raises ClientDisconnect out of
+    # the chunk loop (and a cancelled task raises CancelledError), and a
+    # leaked increment would wedge the endpoint at 503 once enough uploads
+    # abort. Only a successful submit hands the decrement over to the
+    # future's done callback.
+    try:
+        total = 0
+        async with aiofiles.open(file_path, "wb") as f:
+            async for chunk in request.stream():
+                total += len(chunk)
+                if total > _MAX_UPLOAD_BYTES:
+                    break
+                await f.write(chunk)
+        if total > _MAX_UPLOAD_BYTES:
+            try:
+                os.unlink(file_path)
+            except OSError:
+                pass
+            with _PENDING_LOCK:
+                _PENDING_JOBS -= 1
+            return ORJSONResponse(
+                {"error": "file exceeds the 100 MB upload limit"}, status_code=413)
+
+        add_meta_entry(file_id, safe_name, status="processing")
+
+        # hand processing to the warm worker pool (background)
+        # Pass file_path and file_id so results are consistent
+        future = EXECUTOR.submit(_run_processing, file_path, file_id)
+    except BaseException:
+        try:
+            os.unlink(file_path)
+        except OSError:
+            pass
+        with _PENDING_LOCK:
+            _PENDING_JOBS -= 1
+        raise
+
+    future.add_done_callback(_job_done)
+    return ORJSONResponse({"status": "processing", "file_id": file_id})
+
+# Batch variant: one request and one meta lookup for any number of ids,
+# for pollers tracking several uploads at once (the dashboard itself uses
+# the SSE stream below)
+@app.get("/status")
+def status_batch(ids: str = ""):
+    want = [i for i in ids.split(",") if i]
+    meta = _load_meta()
+    return ORJSONResponse({k: meta[k] for k in want if k in meta})
 
 # Polling endpoint returns status + plot list
 @app.get("/status/{file_id}")
 def status(file_id: str):
-    meta = json.loads(METAFILE.read_text())
+    meta = _load_meta()
     if file_id not in meta:
-        return JSONResponse({"status": "not_found"}, status_code=404)
-    return JSONResponse(meta[file_id])
-
-# Serve a specific plot (PNG) or other result files
-@app.get("/result/{file_id}/{filename}")
-def get_result(file_id: str, filename: str):
-    path = RESULT_DIR / filename
-    if not path.exists():
-        return JSONResponse({"error": "not found"}, status_code=404)
-    return FileResponse(path, media_type="image/png")
-
-# Simple history page (JSON)
+        return ORJSONResponse({"status": "not_found"}, status_code=404)
+    return ORJSONResponse(meta[file_id])
+
+# SSE stream of status transitions: one long-lived connection per upload
+# instead of a /status request every 2 seconds. The worker runs in a
+# separate process and talks to us through the metafile, so the generator
+# watches the mtime-cached meta snapshot (near-free per tick) and only
+# emits when the entry actually changed.
+@app.get("/events/{file_id}")
+async def events(file_id: str):
+    async def stream():
+        last = None
+        while True:
+            entry = _load_meta().get(file_id)
+            if entry is not None and entry != last:
+                last = dict(entry)
+                yield b"data: " + orjson.dumps(entry) + b"\n\n"
+                if entry.get("status") in ("done", "error"):
+                    return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+# Result files live in RESULT_DIR/{file_id}/ (the worker creates one subdir
+# per upload), so /result/{file_id}/{filename} is just a static mount.
+# StaticFiles stats/opens off the event loop, sets ETag/Last-Modified and
+# answers conditional requests itself, and guesses the media type per file
+# instead of the hard-coded image/png the old handler sent for everything.
+class _ResultFiles(StaticFiles):
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        # plots are content-addressed (uuid in every name) and never
+        # rewritten, so browsers may cache them forever
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+app.mount("/result", _ResultFiles(directory=RESULT_DIR), name="result")
+
+# Simple history page (JSON). Every connected browser refetches this after
+# every completion, and meta only changes when the metafile does — so the
+# sorted, serialized body is cached and keyed on the same mtime that guards
+# the meta cache. Unchanged meta means a straight memcpy of cached bytes.
+_HISTORY_CACHE = {"mtime": None, "items": [], "bodies": {}}
+
 @app.get("/history")
-def history():
-    meta = json.loads(METAFILE.read_text())
-    # return sorted by processed_at
-    items = sorted(meta.values(), key=lambda x: x.get("processed_at") or "", reverse=True)
-    return JSONResponse(items)
+def history(limit: int = 50):
+    meta = _load_meta()
+    if _HISTORY_CACHE["mtime"] != _META_CACHE["mtime"]:
+        # sorted by processed_at, newest first; serialized slices are cached
+        # per limit until the meta changes again
+        _HISTORY_CACHE["items"] = sorted(
+            meta.values(), key=lambda x: x.get("processed_at") or "", reverse=True)
+        _HISTORY_CACHE["bodies"] = {}
+        _HISTORY_CACHE["mtime"] = _META_CACHE["mtime"]
+    limit = max(1, min(limit, _META_MAX_ENTRIES))
+    body = _HISTORY_CACHE["bodies"].get(limit)
+    if body is None:
+        body = _HISTORY_CACHE["bodies"][limit] = orjson.dumps(_HISTORY_CACHE["items"][:limit])
+    return Response(body, media_type="application/json")
 
 # Optional: lightweight static content (if you had assets)
 # app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -329,7 +612,10 @@ def history():
 # </html>
 # """
 
-HTML_CONTENT = """
+# Shared dashboard markup: the full page and the WordPress embed differ
+# only in their <head>, so each is built as head + _BODY_HTML instead of
+# string-splitting one page to recover the body of the other.
+_HEAD_FULL = """
 <!doctype html>
 <html>
 <head>
@@ -437,7 +723,9 @@ HTML_CONTENT = """
     }
   </style>
 </head>
-<body>
+<body>"""
+
+_BODY_HTML = """
   <div id="zoom-overlay">
     <img id="zoom-image">
   </div>
@@ -523,10 +811,16 @@ async function startUploads(files){
     `;
     statusArea.prepend(card);
 
-    // upload file
-    const fd = new FormData(); fd.append('file', file);
+    // upload the raw file body; the server reads it straight off the wire
     try{
-      const res = await fetch('/upload_html', { method:'POST', body: fd });
+      const res = await fetch('/upload_html', {
+        method:'POST',
+        body: file,
+        headers: {
+          'Content-Type': 'application/octet-stream',
+          'X-Filename': encodeURIComponent(file.name)
+        }
+      });
       if(!res.ok){ document.getElementById(`badge-${id}`).className='status-badge status-error'; document.getElementById(`badge-${id}`).innerText='Upload failed'; continue;}
       const j = await res.json();
       const file_id = j.file_id;
@@ -556,14 +850,14 @@ function attachToggle(id){
   });
 }
 
-// Polling multiple files concurrently
+// One SSE stream per file: the server pushes state transitions, so the UI
+// reacts within milliseconds instead of on a 2-second polling tick
 function pollMultiple(entries){
-  const interval = setInterval(async ()=>{
-    for(const entry of entries){
+  for(const entry of entries){
+    const es = new EventSource(`/events/${entry.file_id}`);
+    es.onmessage = (ev)=>{
       try{
-        const sres = await fetch(`/status/${entry.file_id}`);
-        if(!sres.ok) continue;
-        const info = await sres.json();
+        const info = JSON.parse(ev.data);
         const badge = document.getElementById(`badge-${entry.tmpId}`);
         const previewBox = document.getElementById(`preview-${entry.tmpId}`);
         const plotsBox = document.getElementById(`plots-${entry.tmpId}`);
@@ -602,21 +896,17 @@ function pollMultiple(entries){
           badge.innerText = 'Done';
           badge.className = 'status-badge status-done';
         }
+        // the server closes the stream after a terminal state
+        if(info.status === 'done' || info.status === 'error'){
+          es.close();
+          loadHistory();
+        }
       }catch(e){
-        console.log('poll error', e);
+        console.log('sse error', e);
       }
-    }
-    // stop polling when all are done or errored
-    const states = entries.map(en=>{
-      const b = document.getElementById(`badge-${en.tmpId}`);
-      if(!b) return null;
-      return b.innerText.toLowerCase();
-    });
-    const unfinished = states.filter(s=>s && s.match(/processing|queued/));
-    if(unfinished.length === 0) clearInterval(interval);
-    // refresh history occasionally
-    loadHistory();
-  }, 2000);
+    };
+    es.onerror = ()=>{ es.close(); };
+  }
 }
 
 // Load history (all previous uploads)
@@ -698,10 +988,12 @@ document.getElementById("zoom-overlay").addEventListener("click", () => {
 </html>
 """
 
+HTML_CONTENT = _HEAD_FULL + _BODY_HTML
+
 # ---------------------------
 # EMBEDDED dashboard for WordPress
 # ---------------------------
-HTML_CONTENT_EMBED = """
+_HEAD_EMBED = """
 <!doctype html>
 <html>
 <head>
@@ -784,5 +1076,18 @@ HTML_CONTENT_EMBED = """
 <body>
   <div class="container">
     <!-- REUSE your main dashboard HTML from original page -->
-""" + HTML_CONTENT.split("<body>")[1]
+"""
+
+HTML_CONTENT_EMBED = _HEAD_EMBED + _BODY_HTML
+
+def _page_payloads(html, extra_headers=None):
+    # Cached payloads only — encoded bytes, their gzipped form, and the
+    # base headers; _page_response wraps them in a fresh Response per hit
+    headers = {"Cache-Control": "public, max-age=300", "Vary": "Accept-Encoding"}
+    if extra_headers:
+        headers.update(extra_headers)
+    raw = html.encode("utf-8")
+    return {"plain": raw, "gz": gzip.compress(raw, compresslevel=9), "headers": headers}
 
+_INDEX_PAGE = _page_payloads(HTML_CONTENT)
+_EMBED_PAGE = _page_payloads(HTML_CONTENT_EMBED, {"X-Frame-Options": "ALLOWALL"})